@@ -117,14 +117,14 @@ class SpeedtestService(Service):
                 # check the return code, react
                 if exec_res and exec_res.returncode == 0:
                     # parse the result
-                    res = json.loads(exec_res.stdout, encoding='utf-8')
+                    res = json.loads(exec_res.stdout)
                     # success
                     self.log.debug(f'Speedtest execution succeeded, stdout: {exec_res.stdout.decode("utf-8").rstrip()}')
 
-                    jitterMicroSecs = int(1000 * float(res['ping']['jitter']))
-                    pingMicroSecs = int(1000 * float(res['ping']['latency']))
-                    downloadKbps = int(int(res['download']['bandwidth']) * 8 / 1000)
-                    uploadKbps = int(int(res['upload']['bandwidth']) * 8 / 1000)
+                    jitterMicroSecs = int(1000 * res['ping']['jitter'])
+                    pingMicroSecs = int(1000 * res['ping']['latency'])
+                    downloadKbps = res['download']['bandwidth'] * 8 // 1000
+                    uploadKbps = res['upload']['bandwidth'] * 8 // 1000
                     externalIP = res['interface']['externalIp']
 
                     self.the_last_reading = self.persistence.add_speedtest_successful_reading(
@@ -1,9 +1,10 @@
 #!/usr/bin/python3
 
 from array import array
-from scipy import stats
+import numpy as np
 from collections import deque, Counter
-import re
+from typing import Callable
+import struct
 
 from service.common import *
 from device.dev_i2c import *
@@ -15,6 +16,7 @@ from core.util import TimeWindowList
 from util.tendency import TendencyChecker
 from persistence.schema import *
 from datetime import timedelta
+import time
 
 
 class WeatherStationService(Service):
@@ -245,8 +247,10 @@ class WeatherStationService(Service):
 
         self.log.debug('Air Quality Sensor is powered. Warming up')
 
+        _exit = ExitEvent()
+
         # warm up
-        ExitEvent().wait(self.air_quality_warmup_time_s)
+        _exit.wait(self.air_quality_warmup_time_s)
 
         # mark start time
         time_mark = datetime.now()
@@ -262,7 +266,7 @@ class WeatherStationService(Service):
 
         self.log.debug('Measuring air quality')
 
-        while not ExitEvent().is_set() \
+        while not _exit.is_set() \
                 and (datetime.now() - time_mark).total_seconds() < self.air_quality_measure_time_s:
             try:
                 result = self.air_quality_device.read_single()
@@ -278,8 +282,8 @@ class WeatherStationService(Service):
 
         if len(pm25) > 0:
             final_result = AirQualityMeasurement(
-                stats.mode(pm25, nan_policy='omit').mode[0],
-                stats.mode(pm10, nan_policy='omit').mode[0])
+                int(most_common_value(np.asarray(pm25))),
+                int(most_common_value(np.asarray(pm10))))
 
             self.log.info(f'Air quality results: '
                           f'PM10 = {final_result.PM_2_5()} (mode of {len(pm25)} samples) '
@@ -543,8 +547,9 @@ class AbstractIntensityObserver(Thread):
         Once finished, the thread is dead and cannot be resumed.
         :return:
         """
+        _exit = ExitEvent()
         try:
-            while not ExitEvent().is_set():
+            while not _exit.is_set():
                 measurement = self.measure()
 
                 # it is assumed that 100% is not reachable, therefore indicates error
@@ -572,7 +577,7 @@ class AbstractIntensityObserver(Thread):
 
                 self.current_observations.append(measurement)
 
-                ExitEvent().wait(self.sleep_time_between_measures_s)
+                _exit.wait(self.sleep_time_between_measures_s)
             self.activity_state.mark_dead("Peacefully deceased")
 
         except Exception as e:
@@ -630,8 +635,11 @@ class AbstractIntensityObserver(Thread):
         """
         if duration > self.observation_minimum_duration_seconds:
 
-            mean = stats.tmean(self.active_observations) / 10
-            variance = stats.variation(self.active_observations) / 10
+            _observations = np.asarray(self.active_observations)
+            _mean = _observations.mean()
+            mean = _mean / 10
+            # coefficient of variation
+            variance = (_observations.std() / _mean if _mean != 0 else 0.0) / 10
 
             self.parent_service.log.info(f'Closing reading for {str(self)}. '
                                          f'During {duration} seconds, '
@@ -767,11 +775,14 @@ class LuminosityObserver(AbstractADCObserver):
             return NotAvailableJsonBean()
 
         return DaylightReadingJson(
-                luminescence_perc=int(stats.tmean(self.current_observations) / 10),
+                luminescence_perc=int(sum(self.current_observations) / len(self.current_observations) / 10),
                 is_sunlight=self.is_observation_active)
 
 
 class Impulse:
+    # time mark as POSIX timestamp, duration, time since previous impulse
+    STRUCT = struct.Struct('<dff')
+
     def __init__(self,
                  time_mark: datetime = datetime.now(),
                  duration_s: float = 0.0, time_since_previous_s: float = 0.0):
@@ -782,34 +793,46 @@ class Impulse:
     def get_time_mark(self):
         return self.time_mark
 
-    def to_json(self):
-        return json.dumps([self.time_mark.isoformat(), self.duration_s, self.time_since_previous_s])
+    def to_bytes(self) -> bytes:
+        return self.STRUCT.pack(self.time_mark.timestamp(), self.duration_s, self.time_since_previous_s)
 
     @staticmethod
-    def from_json(jsn: str):
-        _parsed = json.loads(jsn)
-        return Impulse(time_mark=datetime.fromisoformat(_parsed[0]),
-                       duration_s=float(_parsed[1]),
-                       time_since_previous_s=float(_parsed[2]))
+    def from_unpacked(timestamp: float, duration_s: float, time_since_previous_s: float):
+        return Impulse(time_mark=datetime.fromtimestamp(timestamp),
+                       duration_s=duration_s,
+                       time_since_previous_s=time_since_previous_s)
 
 
-class WinDirReading:
-    def __init__(self, time_mark: datetime, direction: WindDirection):
-        self.time_mark = time_mark
-        self.direction = direction
+def store_time_window(window: TimeWindowList, file_path: str):
+    """
+    Stores observations kept in the time window to the file as concatenated fixed-size binary records
+    :param window: the time window with observations providing to_bytes(), e.g. Impulse
+    :param file_path: the path to the file, which will be overwritten
+    :return:
+    """
+    _content = b''.join([_obs.to_bytes() for _obs in window.as_list()])
+    with open(file_path, 'wb') as _file:
+        _file.write(_content)
 
-    def get_time_mark(self):
-        return self.time_mark
 
-    def to_json(self):
-        return json.dumps([self.time_mark.isoformat(), self.direction.value])
+def restore_time_window(window: TimeWindowList, file_path: str, record_class):
+    """
+    Restores observations previously stored with store_time_window. Missing file is silently ignored,
+    incomplete trailing record (if any) is skipped.
+    :param window: the time window to be filled with restored observations
+    :param file_path: the path to the file
+    :param record_class: class of the observations providing STRUCT and from_unpacked(), e.g. Impulse
+    :return:
+    """
+    if not os.path.isfile(file_path):
+        return
+
+    with open(file_path, 'rb') as _file:
+        _content = _file.read()
 
-    @staticmethod
-    def from_json(jsn: str):
-        _parsed = json.loads(jsn)
-        return WinDirReading(
-            time_mark=datetime.fromisoformat(_parsed[0]),
-            direction=WindDirection(int(_parsed[1])))
+    _complete = len(_content) - len(_content) % record_class.STRUCT.size
+    window.extend([record_class.from_unpacked(*_values)
+                   for _values in record_class.STRUCT.iter_unpack(_content[:_complete])])
 
 
 class WindDirectionObservation:
@@ -874,32 +897,37 @@ class WindObserver(Thread):
 
         self._activity_state.all_fine()
 
-        while not ExitEvent().is_set():
+        _exit = ExitEvent()
+        while not _exit.is_set():
             # sleeps till full hour
-            ExitEvent().wait(
-                timeout=(
-                    (datetime.now() + timedelta(hours=1)).
-                    replace(minute=0, second=0, microsecond=0) - datetime.now()).total_seconds())
+            _now = datetime.now()
+            _next_full_hour = (_now + timedelta(hours=1)).replace(minute=0, second=0, microsecond=0)
+            _exit.wait(timeout=(_next_full_hour - _now).total_seconds())
             # store the reading to database
-            if not ExitEvent().is_set() and self.anemometer.last_observation_at is not None:
+            if not _exit.is_set() and self.anemometer.last_observation_at is not None:
                 try:
                     db_bean = self.parent.store_wind_observation()
                     self.parent.log.info(f'Wind observation stored to database: {str(db_bean)}')
 
-                    _unknown_dir = self.direction.unknown_readings_1hour()
-                    mc_unknown_dir_list = ",".join([f"{_mc}: {int(100*_mc[1]/len(_unknown_dir))}%"
-                                                    for _mc in Counter(_unknown_dir).most_common(10)])
-                    _all_dir_readings = self.direction.all_readings_1hour()
-                    mc_all_dir_list = ",".join([f"{_mc[0].name}: {int(100*_mc[1]/len(_all_dir_readings))}%"
-                                                for _mc in Counter(_all_dir_readings).most_common()])
-                    if db_bean.direction_dominant == WindDirection.UNKNOWN.value:
-                        self.parent.log.warning(f'There is a lot of wind direction unknown readings '
-                                                f'({len(_unknown_dir)}): {mc_unknown_dir_list}')
-                        self.parent.log.info(f'All detected directions: {mc_all_dir_list}')
-                    else:
-                        self.parent.log.debug(f'There is {len(_unknown_dir)} unknown wind direction readings. '
-                                              f'Most common are: {mc_unknown_dir_list}')
-                        self.parent.log.debug(f'All detected directions: {mc_all_dir_list}')
+                    # the summary of directions is reported only if it is going to be logged
+                    _is_direction_unknown = db_bean.direction_dominant == WindDirection.UNKNOWN.value
+                    if _is_direction_unknown or self.parent.log.isEnabledFor(logging.DEBUG):
+                        _unknown_dir = self.direction.unknown_readings_1hour()
+                        _unknown_dir_count = sum(_unknown_dir.values())
+                        mc_unknown_dir_list = ",".join([f"{_mc}: {int(100*_mc[1]/_unknown_dir_count)}%"
+                                                        for _mc in _unknown_dir.most_common(10)])
+                        _all_dir_readings = self.direction.all_readings_1hour()
+                        _all_dir_count = sum(_all_dir_readings.values())
+                        mc_all_dir_list = ",".join([f"{_mc[0].name}: {int(100*_mc[1]/_all_dir_count)}%"
+                                                    for _mc in _all_dir_readings.most_common()])
+                        if _is_direction_unknown:
+                            self.parent.log.warning(f'There is a lot of wind direction unknown readings '
+                                                    f'({_unknown_dir_count}): {mc_unknown_dir_list}')
+                            self.parent.log.info(f'All detected directions: {mc_all_dir_list}')
+                        else:
+                            self.parent.log.debug(f'There is {_unknown_dir_count} unknown wind direction readings. '
+                                                  f'Most common are: {mc_unknown_dir_list}')
+                            self.parent.log.debug(f'All detected directions: {mc_all_dir_list}')
 
                 except Exception as e:
                     _msg = f'ERROR during storing wind observation: {str(e)}'
@@ -953,34 +981,40 @@ class WindObserver(Thread):
         def __init__(self, pin: int, temp_file_loc: str):
             Thread.__init__(self)
             self.last_observation_at: datetime = None
+            self._last_observation_monotonic: float = None
             self.observed_pin = StatelessButton(pin, self._on_signal)
             self._observations_1min = TimeWindowList(
                 validity_time_s=WindObserver.DURATION_1MIN_S, get_time_mark_function=lambda x: x.get_time_mark())
             self._observations_1hour = TimeWindowList(
                 validity_time_s=WindObserver.DURATION_1HOUR_S, get_time_mark_function=lambda x: x.get_time_mark())
-            self._temp_file_1min = os.path.join(temp_file_loc, f'anemometer_1min.json')
-            self._temp_file_1hour = os.path.join(temp_file_loc, f'anemometer_1hour.json')
-            self._observations_1min.from_file(file_path=self._temp_file_1min, from_json=Impulse.from_json)
-            self._observations_1hour.from_file(file_path=self._temp_file_1hour, from_json=Impulse.from_json)
+            self._temp_file_1min = os.path.join(temp_file_loc, f'anemometer_1min.bin')
+            self._temp_file_1hour = os.path.join(temp_file_loc, f'anemometer_1hour.bin')
+            restore_time_window(self._observations_1min, self._temp_file_1min, Impulse)
+            restore_time_window(self._observations_1hour, self._temp_file_1hour, Impulse)
             self.activity_state = ActivityState(type(self).__name__)
 
         def run(self) -> None:
             self.activity_state.all_fine('Nothing measured yet')
-            while not ExitEvent().is_set():
-                ExitEvent().wait(timeout=self.STORE_TEMP_DATA_EACH_S)
+            _exit = ExitEvent()
+            while not _exit.is_set():
+                _exit.wait(timeout=self.STORE_TEMP_DATA_EACH_S)
                 # store temp data
-                self._observations_1min.to_file(file_path=self._temp_file_1min, to_json=Impulse.to_json)
-                self._observations_1hour.to_file(file_path=self._temp_file_1hour, to_json=Impulse.to_json)
+                store_time_window(self._observations_1min, self._temp_file_1min)
+                store_time_window(self._observations_1hour, self._temp_file_1hour)
 
             self.observed_pin.close()
             self.activity_state.mark_dead('I did my job, farewell!')
 
         def _on_signal(self, duration: float, pin: int):
+            # the interval between impulses is taken from monotonic clock, which is both cheaper
+            # than datetime arithmetic and immune to wall-clock adjustments
+            _now_monotonic = time.monotonic()
             _now = datetime.now()
             _impulse = Impulse(time_mark=_now,
                                duration_s=duration,
-                               time_since_previous_s=0.0 if self.last_observation_at is None
-                               else (_now - self.last_observation_at).total_seconds())
+                               time_since_previous_s=0.0 if self._last_observation_monotonic is None
+                               else _now_monotonic - self._last_observation_monotonic)
+            self._last_observation_monotonic = _now_monotonic
             self.last_observation_at = _now
             self._observations_1min.append(_impulse)
             self._observations_1hour.append(_impulse)
@@ -1004,7 +1038,6 @@ class WindObserver(Thread):
             # the below defines the outliers for wind speed
             # 200 kmph is an arbitrary number, taken out of thumb
             _outliers = (0, 200)
-            _outliers_are_included = (False, False)
 
             # WIND SPEED
             # from documentation of the sensor:
@@ -1014,18 +1047,21 @@ class WindObserver(Thread):
             # The best option is to use the "count of impulses per period", but as the impulses can be
             # stored\restored with gaps between, it is better to measure the average of momentary speeds
             # Therefore, start with detecting if there are gaps
-            _momentary_speed = [
+            _momentary_speed = np.array([
                 self.ONE_IMPULSE_PER_SEC_IS_KMPH/_imp.time_since_previous_s if _imp.time_since_previous_s > 0 else 0
-                for _imp in _wind_speed]
-            if min(_momentary_speed) == 0:
+                for _imp in _wind_speed])
+            # momentary speeds with outliers (both limits excluded) left out
+            _within_limits = _momentary_speed[(_momentary_speed > _outliers[0]) & (_momentary_speed < _outliers[1])]
+            if _momentary_speed.min() == 0:
                 # calculate the average from momentary speeds
-                _average = stats.tmean(_momentary_speed, limits=_outliers, inclusive=_outliers_are_included)
+                _average = _within_limits.mean() if len(_within_limits) > 0 else 0
             else:
                 # there are no gaps in measurements; calculate the speed by couting all impulses within obs. window
                 _average = (self.ONE_IMPULSE_PER_SEC_IS_KMPH * len(_wind_speed) / _duration) if _duration > 0 else 0
 
-            _variance = stats.tvar(_momentary_speed, limits=_outliers, inclusive=_outliers_are_included)
-            _peak = stats.tmax(_momentary_speed, upperlimit=_outliers[1], inclusive=_outliers_are_included[1])
+            _variance = _within_limits.var(ddof=1) if len(_within_limits) > 1 else 0
+            _below_upper_limit = _momentary_speed[_momentary_speed < _outliers[1]]
+            _peak = _below_upper_limit.max() if len(_below_upper_limit) > 0 else 0
 
             return WindSpeedObservation(
                 average_speed=_average,
@@ -1035,20 +1071,23 @@ class WindObserver(Thread):
 
     class WindDirectionObserver(Thread):
         STORE_TEMP_DATA_EACH_S = 600
+        # single reading: time mark as POSIX timestamp (0 denotes empty slot) and value of the direction
+        READING_DTYPE = np.dtype([('time_mark', '<f8'), ('direction', '<i2')])
+        # reverse lookup of stored direction values, cheaper than calling the enum
+        DIRECTION_BY_VALUE = {_direction.value: _direction for _direction in WindDirection}
 
         def __init__(self, parent: WeatherStationService, temp_file_loc: str, sleep_time_between_measures_s: float):
             Thread.__init__(self)
             self._parent_service = parent
-            self._temp_file_1min = os.path.join(temp_file_loc, f'windir_1min.json')
-            self._temp_file_1hour = os.path.join(temp_file_loc, f'windir_1hour.json')
-            self._observations_1min = TimeWindowList(
-                validity_time_s=WindObserver.DURATION_1MIN_S, get_time_mark_function=lambda x: x.get_time_mark())
-            self._observations_1hour = TimeWindowList(
-                validity_time_s=WindObserver.DURATION_1HOUR_S, get_time_mark_function=lambda x: x.get_time_mark())
-            self._observations_1min.from_file(file_path=self._temp_file_1min, from_json=WinDirReading.from_json)
-            self._observations_1hour.from_file(file_path=self._temp_file_1hour, from_json=WinDirReading.from_json)
-            self._temp_file_last_stored = datetime.now()
+            self._temp_file = os.path.join(temp_file_loc, f'windir_1hour.bin')
             self._sleep_time_between_measures_s = sleep_time_between_measures_s
+            # ring buffer large enough to keep readings of the last hour; both 1-minute and 1-hour observations
+            # are derived from it
+            self._readings = np.zeros(
+                int(WindObserver.DURATION_1HOUR_S / sleep_time_between_measures_s) + 1, dtype=self.READING_DTYPE)
+            self._readings_head = 0
+            self._restore_readings()
+            self._temp_file_last_stored = datetime.now()
             self._measurement_to_direction = {}
             for _p in range(101):
                 if 30 <= _p <= 50:
@@ -1069,67 +1108,129 @@ class WindObserver(Thread):
                     self._measurement_to_direction[_p] = WindDirection.S
                 else:
                     self._measurement_to_direction[_p] = WindDirection.UNKNOWN
-            self._unknown_readings = TimeWindowList(validity_time_s=60*60, get_time_mark_function=lambda x: x[1])
+            # raw readings not matching any direction in the last hour: time-ordered (time mark, raw reading)
+            # pairs used for expiring them and the counter of raw readings maintained along
+            self._unknown_readings = deque()
+            self._unknown_readings_counter = Counter()
             self.activity_state = ActivityState(type(self).__name__)
 
         def run(self) -> None:
             self.activity_state.all_fine('Nothing measured yet')
-            while not ExitEvent().is_set():
+            _exit = ExitEvent()
+            while not _exit.is_set():
                 # read
-                _reading = self._read()
-                self._observations_1min.append(_reading)
-                self._observations_1hour.append(_reading)
-                self.activity_state.all_fine(f'Measured direction: {_reading.direction.name}')
+                _direction = self._read()
+                self.activity_state.all_fine(f'Measured direction: {_direction.name}')
 
-                ExitEvent().wait(timeout=self._sleep_time_between_measures_s)
+                _exit.wait(timeout=self._sleep_time_between_measures_s)
 
-                if (datetime.now() - self._temp_file_last_stored).total_seconds() > self.STORE_TEMP_DATA_EACH_S \
-                        or ExitEvent().is_set():
+                _now = datetime.now()
+                if (_now - self._temp_file_last_stored).total_seconds() > self.STORE_TEMP_DATA_EACH_S \
+                        or _exit.is_set():
                     # store temp data
-                    self._observations_1min.to_file(file_path=self._temp_file_1min, to_json=WinDirReading.to_json)
-                    self._observations_1hour.to_file(file_path=self._temp_file_1hour, to_json=WinDirReading.to_json)
-                    self._temp_file_last_stored = datetime.now()
+                    self._store_readings()
+                    self._temp_file_last_stored = _now
 
             self.activity_state.mark_dead("Good bye, I'm done here")
 
-        def _read(self) -> WinDirReading:
+        def _read(self) -> WindDirection:
+            _now = time.time()
             _raw_reading = int(self._parent_service.adc_device.read_percentile(2) / 10)
             _direction = self._measurement_to_direction[_raw_reading]
             if _direction == WindDirection.UNKNOWN:
-                self._unknown_readings.append((_raw_reading, datetime.now()))
-            return WinDirReading(
-                time_mark=datetime.now(),
-                direction=_direction
-            )
+                self._unknown_readings.append((_now, _raw_reading))
+                self._unknown_readings_counter[_raw_reading] += 1
+            # the direction is set before the time mark, so that the slot does not become valid with stale direction
+            self._readings['direction'][self._readings_head] = _direction.value
+            self._readings['time_mark'][self._readings_head] = _now
+            self._readings_head = (self._readings_head + 1) % len(self._readings)
+
+            self._expire_unknown_readings()
+            return _direction
+
+        def _expire_unknown_readings(self):
+            _expired_before = time.time() - WindObserver.DURATION_1HOUR_S
+            while self._unknown_readings and self._unknown_readings[0][0] < _expired_before:
+                _raw_reading = self._unknown_readings.popleft()[1]
+                self._unknown_readings_counter[_raw_reading] -= 1
+                if self._unknown_readings_counter[_raw_reading] == 0:
+                    del self._unknown_readings_counter[_raw_reading]
+
+        def _readings_within(self, duration_s: int) -> np.ndarray:
+            """
+            Returns readings (copy) made within given time
+            :param duration_s: how many seconds back the readings should be taken
+            :return: array of READING_DTYPE records, in no particular order
+            """
+            return self._readings[self._readings['time_mark'] >= time.time() - duration_s]
+
+        def _store_readings(self):
+            _valid = self._readings[self._readings['time_mark'] > 0]
+            with open(self._temp_file, 'wb') as _file:
+                _file.write(np.sort(_valid, order='time_mark').tobytes())
+
+        def _restore_readings(self):
+            if not os.path.isfile(self._temp_file):
+                return
+
+            with open(self._temp_file, 'rb') as _file:
+                _content = _file.read()
+
+            # incomplete trailing record (if any) is skipped; if there are more records than slots, the newest win
+            _count = len(_content) // self.READING_DTYPE.itemsize
+            if _count == 0:
+                return
+            _restored = np.frombuffer(_content, dtype=self.READING_DTYPE, count=_count)[-len(self._readings):]
+            self._readings[:len(_restored)] = _restored
+            self._readings_head = len(_restored) % len(self._readings)
 
         def get_dominant_direction_1min(self) -> WindDirectionObservation:
-            return self._get_dominant_direction(self._observations_1min)
+            return self._get_dominant_direction(WindObserver.DURATION_1MIN_S)
 
         def get_dominant_direction_1hour(self) -> WindDirectionObservation:
-            return self._get_dominant_direction(self._observations_1hour)
-
-        def unknown_readings_1hour(self) -> list:
-            return [_ur[0] for _ur in self._unknown_readings.as_list()]
-
-        def all_readings_1hour(self) -> list:
-            return [_r.direction for _r in self._observations_1hour.as_list()]
-
-        @staticmethod
-        def _get_dominant_direction(window_observations: TimeWindowList) -> WindDirectionObservation:
-            _observations = window_observations.as_list()
-            _tw = window_observations.time_window()
+            return self._get_dominant_direction(WindObserver.DURATION_1HOUR_S)
+
+        def unknown_readings_1hour(self) -> Counter:
+            # copy, as the counter is updated by the observer thread
+            return self._unknown_readings_counter.copy()
+
+        def all_readings_1hour(self) -> Counter:
+            _values, _counts = np.unique(
+                self._readings_within(WindObserver.DURATION_1HOUR_S)['direction'], return_counts=True)
+            return Counter({self.DIRECTION_BY_VALUE[int(_value)]: int(_count)
+                            for _value, _count in zip(_values, _counts)})
+
+        def _get_dominant_direction(self, duration_s: int) -> WindDirectionObservation:
+            """
+            Finds the most common direction among the readings made within given time.
+            If more directions are equally common, the one that reached the top count first (in time) wins.
+            :param duration_s: how many seconds back the readings should be taken
+            :return: the observation of the dominant direction
+            """
+            _observations = self._readings_within(duration_s)
             if len(_observations) == 0:
+                _now = datetime.now()
                 return WindDirectionObservation(
                     dominant_direction=WindDirection.UNKNOWN,
                     direction_variance=0,
-                    started_at=_tw[0], ended_at=_tw[1])
+                    started_at=_now, ended_at=_now)
+
+            _values, _counts = np.unique(_observations['direction'], return_counts=True)
+            _top_count = _counts.max()
+            _top_values = _values[_counts == _top_count]
+            _dominant_value = _top_values[0]
+            if len(_top_values) > 1:
+                # the readings are not ordered in the ring buffer, sort them by time only to resolve the tie
+                _directions = _observations['direction'][np.argsort(_observations['time_mark'], kind='stable')]
+                _dominant_value = min(
+                    _top_values, key=lambda _value: np.flatnonzero(_directions == _value)[_top_count - 1])
+            _time_marks = _observations['time_mark']
 
-            _counter = Counter([_obs.direction for _obs in _observations])
-            _dominant = _counter.most_common(1)
             return WindDirectionObservation(
-                dominant_direction=_dominant[0][0],
-                direction_variance=100-int(100.0*_dominant[0][1]/len(_observations)),
-                started_at=_tw[0], ended_at=_tw[1])
+                dominant_direction=self.DIRECTION_BY_VALUE[int(_dominant_value)],
+                direction_variance=100-int(100.0*_top_count/len(_observations)),
+                started_at=datetime.fromtimestamp(_time_marks.min()),
+                ended_at=datetime.fromtimestamp(_time_marks.max()))
 
 
 class RainGaugeObserver(Thread):
@@ -1221,7 +1322,20 @@ class MultisensorReading:
                f'temperature: {self.temperature} [\u2103] ({self.temperature_tendency_explained})'
 
 
+def most_common_value(values: np.ndarray):
+    """
+    Returns the mode of given values; if there are several, the smallest one is returned
+    :param values: non-empty array of integer values
+    :return: the most common value
+    """
+    _values, _counts = np.unique(values, return_counts=True)
+    return _values[_counts.argmax()]
+
+
 class MultisensorObserver(Thread):
+    # TendencyChecker splits the window 80/20; fewer observations leave nothing to compare against
+    MIN_TENDENCY_WINDOW = 5
+
     def __init__(
             self,
             parent: WeatherStationService,
@@ -1234,44 +1348,67 @@ class MultisensorObserver(Thread):
         self.measure_pooling_period = measure_polling_period_s
         self.measure_duration = measure_duration_s
         self.current_reading: MultisensorReading = None
-        # 1h
         self.temperature_tendency_checker = TendencyChecker(
-            observations_window=int(1 * 60 * 60 / (measure_polling_period_s + measure_duration_s)), threshold_perc=0.2)
-        # 2h
+            observations_window=self._tendency_window('temperature', hours=1), threshold_perc=0.2)
         self.humidity_tendency_checker = TendencyChecker(
-            observations_window=int(2 * 60 * 60 / (measure_polling_period_s + measure_duration_s)), threshold_perc=0.1)
-        # 10h
+            observations_window=self._tendency_window('humidity', hours=2), threshold_perc=0.1)
         self.pressure_tendency_checker = TendencyChecker(
-            observations_window=int(10 * 60 * 60 / (measure_polling_period_s + measure_duration_s)),
-            threshold_perc=0.05)
+            observations_window=self._tendency_window('pressure', hours=10), threshold_perc=0.05)
+        # buffers for observations made during single measurement, allocated once and reused;
+        # the capacity covers all the measurements that fit in the polling period
+        self._observations_capacity = max(8, int(measure_polling_period_s / sleep_time_between_measures_s) + 2)
+        self._temperature_observations = np.empty(self._observations_capacity, dtype=np.int32)
+        self._pressure_observations = np.empty(self._observations_capacity, dtype=np.int32)
+        self._humidity_observations = np.empty(self._observations_capacity, dtype=np.int32)
         self.activity_state = ActivityState(type(self).__name__)
 
+    def _tendency_window(self, quantity: str, hours: int) -> int:
+        """
+        Computes the number of observations made during given time, which is the window of the tendency checker.
+        The window is not allowed to be smaller than MIN_TENDENCY_WINDOW.
+        :param quantity: name of the quantity, used for logging only
+        :param hours: the time span of the tendency
+        :return: the observations window
+        """
+        _window = int(hours * 60 * 60 / (self.measure_pooling_period + self.measure_duration))
+        if _window < self.MIN_TENDENCY_WINDOW:
+            self.parent_service.log.warning(
+                f'Polling period {self.measure_pooling_period} s and measure duration {self.measure_duration} s '
+                f'allow only {_window} {quantity} observations in {hours} h, '
+                f'tendency window is extended to {self.MIN_TENDENCY_WINDOW} observations')
+            _window = self.MIN_TENDENCY_WINDOW
+        else:
+            self.parent_service.log.info(f'Tendency of {quantity} is checked over {_window} observations')
+
+        return _window
+
     def run(self):
+        _exit = ExitEvent()
         try:
-            while not ExitEvent().is_set():
-                temperature_observations = array('i')
-                pressure_observations = array('i')
-                humidity_observations = array('i')
+            while not _exit.is_set():
+                _count = 0
 
-                # mark start time
-                time_mark = datetime.now()
+                # the deadline is based on monotonic clock, so that it is not affected by wall-clock adjustments
+                _deadline = time.monotonic() + self.measure_pooling_period
 
                 try:
-                    while not ExitEvent().is_set() \
-                            and (datetime.now() - time_mark).total_seconds() < self.measure_pooling_period:
+                    while not _exit.is_set() \
+                            and time.monotonic() < _deadline \
+                            and _count < self._observations_capacity:
                         current = self.parent_service.multisensor_device.read(
                             timeout_seconds=self.sleep_time_between_measures_s)
 
-                        temperature_observations.append(int(current.temperature() * 10))
-                        pressure_observations.append(current.pressure())
-                        humidity_observations.append(int(current.humidity()))
+                        self._temperature_observations[_count] = int(current.temperature() * 10)
+                        self._pressure_observations[_count] = current.pressure()
+                        self._humidity_observations[_count] = int(current.humidity())
+                        _count += 1
 
-                        ExitEvent().wait(self.sleep_time_between_measures_s)
+                        _exit.wait(self.sleep_time_between_measures_s)
 
                     self.current_reading = MultisensorReading(
-                        temperature=float(stats.mode(temperature_observations, nan_policy='omit').mode[0] / 10),
-                        humidity=int(stats.mode(humidity_observations, nan_policy='omit').mode[0]),
-                        pressure=int(stats.mode(pressure_observations, nan_policy='omit').mode[0]),
+                        temperature=float(most_common_value(self._temperature_observations[:_count]) / 10),
+                        humidity=int(most_common_value(self._humidity_observations[:_count])),
+                        pressure=int(most_common_value(self._pressure_observations[:_count])),
                         temperature_tendency=self.temperature_tendency_checker,
                         humidity_tendency=self.humidity_tendency_checker,
                         pressure_tendency=self.pressure_tendency_checker)
@@ -1285,7 +1422,7 @@ class MultisensorObserver(Thread):
                     self.activity_state.warn(_msg)
                     self.parent_service.log.critical(_msg, exc_info=sys.exc_info())
 
-                ExitEvent().wait(self.measure_pooling_period)
+                _exit.wait(self.measure_pooling_period)
 
             self.activity_state.mark_dead("Peacefully deceased")
 
@@ -1294,46 +1431,36 @@ class MultisensorObserver(Thread):
             self.parent_service.log.critical(f"Fatal error occurred in multi-sensor processing", exc_info=sys.exc_info())
 
     def get_temperature_reading(self) -> AbstractJsonBean:
-        if not self.is_alive():
-            return ErrorJsonBean('Error occurred')
-
-        if not self.current_reading:
-            return NotAvailableJsonBean()
-
-        return ValueTendencyJson(
-            value=self.current_reading.temperature,
-            tendency=self.current_reading.temperature_tendency,
-            timestamp=self.current_reading.timestamp,
-            current_mean=self.temperature_tendency_checker.current_mean,
-            previous_mean=self.temperature_tendency_checker.previous_mean)
+        return self._get_reading(lambda r: (r.temperature, r.temperature_tendency), self.temperature_tendency_checker)
 
     def get_pressure_reading(self) -> AbstractJsonBean:
-        if not self.is_alive():
-            return ErrorJsonBean('Error occurred')
-
-        if not self.current_reading:
-            return NotAvailableJsonBean()
-
-        return ValueTendencyJson(
-            value=self.current_reading.pressure,
-            tendency=self.current_reading.pressure_tendency,
-            timestamp=self.current_reading.timestamp,
-            current_mean=self.pressure_tendency_checker.current_mean,
-            previous_mean=self.pressure_tendency_checker.previous_mean)
+        return self._get_reading(lambda r: (r.pressure, r.pressure_tendency), self.pressure_tendency_checker)
 
     def get_humidity_reading(self) -> AbstractJsonBean:
+        return self._get_reading(lambda r: (r.humidity, r.humidity_tendency), self.humidity_tendency_checker)
+
+    def _get_reading(self, value_and_tendency: Callable, tendency_checker: TendencyChecker) -> AbstractJsonBean:
+        """
+        Provides current reading of given quantity for REST interface
+        :param value_and_tendency: accessor returning the value and the tendency of the quantity out of the reading
+        :param tendency_checker: the checker used to determine tendency of the quantity
+        :return: ErrorJsonBean if the thread is dead, NotAvailableJsonBean if nothing is measured yet,
+        ValueTendencyJson otherwise
+        """
         if not self.is_alive():
             return ErrorJsonBean('Error occurred')
 
-        if not self.current_reading:
+        _reading = self.current_reading
+        if not _reading:
             return NotAvailableJsonBean()
 
+        _value, _tendency = value_and_tendency(_reading)
         return ValueTendencyJson(
-            value=self.current_reading.humidity,
-            tendency=self.current_reading.humidity_tendency,
-            timestamp=self.current_reading.timestamp,
-            current_mean=self.humidity_tendency_checker.current_mean,
-            previous_mean=self.humidity_tendency_checker.previous_mean)
+            value=_value,
+            tendency=_tendency,
+            timestamp=_reading.timestamp,
+            current_mean=tendency_checker.current_mean,
+            previous_mean=tendency_checker.previous_mean)
 
 
 class CoolingConfig(Enum):
@@ -1355,25 +1482,35 @@ class RPiCoolDown(Thread):
         self.day_only_hour_on = 8
         self.day_only_hour_off = 22
 
-        self.COMMAND_VCGENCMD = 'vcgencmd'
-        self.COMMAND_MEASURETEMP = 'measure_temp'
-
-        self.measure_temp_output_re_pattern = re.compile('temp=(\\d+\\.\\d*).*')
+        # the temperature of the SoC, in millidegrees of Celsius
+        self.THERMAL_ZONE_TEMP_FILE = '/sys/class/thermal/thermal_zone0/temp'
 
         self.activity_state = ActivityState(type(self).__name__)
 
     def run(self):
+        _exit = ExitEvent()
         try:
-            while not ExitEvent().is_set():
-                exec_res = subprocess.run([self.COMMAND_VCGENCMD, self.COMMAND_MEASURETEMP], capture_output=True)
-
-                exec_stdout = exec_res.stdout.decode('utf-8')
-
-                if exec_res.returncode == 0:
-                    temp_matched = self.measure_temp_output_re_pattern.match(exec_stdout)
-                    if temp_matched:
-                        temp = float(temp_matched.group(1))
+            # the file is kept open and re-read from the beginning on each probe;
+            # after a failed read it is closed and reopened by the next probe
+            _thermal_fd = None
+            try:
+                while not _exit.is_set():
+                    try:
+                        if _thermal_fd is None:
+                            _thermal_fd = os.open(self.THERMAL_ZONE_TEMP_FILE, os.O_RDONLY)
+                        os.lseek(_thermal_fd, 0, os.SEEK_SET)
+                        _raw = os.read(_thermal_fd, 16)
+                        temp = int(_raw) / 1000.0
+
+                    except (OSError, ValueError) as e:
+                        _msg = f'Internal temperature cannot be read from {self.THERMAL_ZONE_TEMP_FILE}: {str(e)}'
+                        self.activity_state.warn(_msg)
+                        self.parent_service.log.error(_msg)
+                        if _thermal_fd is not None:
+                            os.close(_thermal_fd)
+                            _thermal_fd = None
 
+                    else:
                         if temp > self.on_temp and not self.fan.is_active and (
                                 not self.day_only
                                 or (self.day_only_hour_on <= datetime.now().hour < self.day_only_hour_off)):
@@ -1392,19 +1529,11 @@ class RPiCoolDown(Thread):
                             self.activity_state.all_fine(f'{self.parent_service.get_hostname()} temperature: {temp}, '
                                                          f'the cooling is {"ON" if self.fan.is_active else "OFF"}')
 
-                    else:
-                        _msg = f'Internal temperature cannot be properly parsed from {exec_stdout} ' \
-                               f'using pattern {self.measure_temp_output_re_pattern.pattern}'
-                        self.activity_state.warn(_msg)
-                        self.parent_service.log.error(_msg)
-                else:
-                    _msg = f'Internal temperature measure failed. Stdout: [{exec_stdout}]. ' \
-                           f'Stderr: [{exec_res.stderr.decode("utf-8")}]'
-                    self.activity_state.warn(_msg)
-                    self.parent_service.log.error(_msg)
-
-                ExitEvent().wait(self.probing_period)
-            self.fan.close()
+                    _exit.wait(self.probing_period)
+            finally:
+                if _thermal_fd is not None:
+                    os.close(_thermal_fd)
+                self.fan.close()
             self.activity_state.mark_dead("What do you want? I'm dead now!")
 
         except Exception as e:
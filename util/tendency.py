@@ -1,6 +1,9 @@
-from collections import deque
+from math import fsum
+
 from core.bean import Tendency
-from scipy import stats
+
+# tendencies indexed by the sign of the significant difference of means, shifted by one
+_TENDENCY_BY_SIGN = (Tendency.FALLING, Tendency.STEADY, Tendency.RISING)
 
 
 class TendencyChecker:
@@ -8,6 +11,9 @@ class TendencyChecker:
     Implements very basic approach to detecting tendency.
     Stores N last observations divided into two parts: older (80%) and newer (20%)
     Tendency is rising if the average of "older" observations is significantly lower then "newer"
+    The averages are maintained incrementally (Welford's recurrence), so that each observation costs O(1)
+    regardless of the window size. As removing values from a running mean accumulates rounding errors, both means
+    are recomputed exactly once per full turn of the readings buffer.
     """
 
     def __init__(self, observations_window: int, threshold_perc: float = 0.5):
@@ -16,13 +22,23 @@ class TendencyChecker:
         :param observations_window: number of observations that shall be taken into consideration
         :param threshold_perc: defines whether the difference between previous and current observations is significant
         """
-        self.previous_readings = deque(maxlen=int(observations_window / 5))
-        self.current_readings = deque(maxlen=observations_window - int(observations_window / 5))
         self.threshold = threshold_perc
         self.current_tendency = Tendency.STEADY
         self.current_mean = 0.0
         self.previous_mean = 0.0
         self.current_diff_perc = 0.0
+        # sizes of the parts of the window: previous (older) and current (newer) readings
+        self._previous_max = int(observations_window / 5)
+        self._current_max = observations_window - self._previous_max
+        # ring buffer with the readings of the whole window, the oldest is overwritten
+        self._readings_size = max(1, self._previous_max + self._current_max)
+        self._readings = [0.0] * self._readings_size
+        self._readings_count = 0
+        # running means of both parts; previous_mean falls back to current one if there are no previous readings
+        self._current_count = 0
+        self._current_mean = 0.0
+        self._previous_count = 0
+        self._previous_mean = 0.0
 
     def tendency(self, observation) -> Tendency:
         """
@@ -30,25 +46,77 @@ class TendencyChecker:
         :param observation:
         :return:
         """
-        if len(self.current_readings) == self.current_readings.maxlen:
-            # most recent at the right
-            self.previous_readings.append(self.current_readings.popleft())
+        _size = self._readings_size
+        if self._current_count == self._current_max:
+            # the oldest of current readings becomes the newest of previous ones
+            _moved = self._readings[(self._readings_count - self._current_max) % _size]
+            self._current_count -= 1
+            self._current_mean = self._mean_removed(self._current_mean, self._current_count, _moved)
+
+            if self._previous_max > 0:
+                if self._previous_count == self._previous_max:
+                    # the oldest reading of the window is the one about to be overwritten
+                    _dropped = self._readings[self._readings_count % _size]
+                    self._previous_count -= 1
+                    self._previous_mean = self._mean_removed(self._previous_mean, self._previous_count, _dropped)
+
+                self._previous_count += 1
+                self._previous_mean = self._mean_added(self._previous_mean, self._previous_count, _moved)
 
-        self.current_readings.append(observation)
+        self._readings[self._readings_count % _size] = observation
+        self._readings_count += 1
+        self._current_count += 1
+        self._current_mean = self._mean_added(self._current_mean, self._current_count, observation)
+        if self._readings_count % _size == 0:
+            self._resync_means()
 
-        self.current_mean = stats.tmean(self.current_readings)
-        self.previous_mean = self.current_mean if len(self.previous_readings) == 0 \
-            else stats.tmean(self.previous_readings)
+        self.current_mean = self._current_mean
+        self.previous_mean = self.current_mean if self._previous_count == 0 else self._previous_mean
 
-        self.current_diff_perc = 100 * (self.current_mean - self.previous_mean) / observation
+        _diff_perc = 100 * (self.current_mean - self.previous_mean) / observation
+        _threshold = self.threshold
+        self.current_diff_perc = _diff_perc
 
-        self.current_tendency = Tendency.RISING if self.current_diff_perc - self.threshold > 0 \
-            else Tendency.FALLING if self.current_diff_perc + self.threshold < 0 \
-            else Tendency.STEADY
+        self.current_tendency = _TENDENCY_BY_SIGN[1 + (_diff_perc > _threshold) - (_diff_perc < -_threshold)]
 
         return self.current_tendency
 
     def verbose(self) -> str:
         return f'{self.current_tendency} ' \
-               f'[{len(self.previous_readings) + len(self.current_readings)}] ' \
+               f'[{self._previous_count + self._current_count}] ' \
                f'{self.previous_mean:.5} --> {self.current_mean:.5}'
+
+    def _resync_means(self):
+        """
+        Recomputes both running means from the readings buffer, dropping the drift of the incremental updates
+        """
+        _size = self._readings_size
+        _end = self._readings_count
+        _current = [self._readings[i % _size] for i in range(_end - self._current_count, _end)]
+        _end -= self._current_count
+        _previous = [self._readings[i % _size] for i in range(_end - self._previous_count, _end)]
+        self._current_mean = fsum(_current) / len(_current)
+        if _previous:
+            self._previous_mean = fsum(_previous) / len(_previous)
+
+    @staticmethod
+    def _mean_added(mean: float, count: int, value) -> float:
+        """
+        Updates the mean after a value was added
+        :param mean: the mean before the value was added
+        :param count: number of values including the added one
+        :param value: the added value
+        :return: the updated mean
+        """
+        return mean + (value - mean) / count
+
+    @staticmethod
+    def _mean_removed(mean: float, count: int, value) -> float:
+        """
+        Updates the mean after a value was removed
+        :param mean: the mean before the value was removed
+        :param count: number of values remaining
+        :param value: the removed value
+        :return: the updated mean, 0 if there are no values left
+        """
+        return 0.0 if count == 0 else mean - (value - mean) / count
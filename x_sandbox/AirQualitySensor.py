@@ -14,20 +14,14 @@ MODE_ACTIVE = 0
 MODE_QUERY = 1
 
 
-def construct_command(cmd, data=[]):
+def construct_command(cmd, data=()) -> bytearray:
     assert len(data) <= 12
-    data += [0, ] * (12 - len(data))
     checksum = (sum(data) + cmd - 2) % 256
-    bts = []
-    bts.append(ord('\xaa'))
-    bts.append(ord('\xb4'))
-    bts.append(cmd)
-    for d in data:
-        bts.append(d)
-    bts.append(ord('\xff'))
-    bts.append(ord('\xff'))
-    bts.append(checksum)
-    bts.append(ord('\xab'))
+    # head, command, 12 bytes of data (zero-padded), device id (any), checksum, tail
+    bts = bytearray(19)
+    bts[0:3] = (0xaa, 0xb4, cmd)
+    bts[3:3 + len(data)] = data
+    bts[15:19] = (0xff, 0xff, checksum, 0xab)
 
     return bts
 
@@ -38,45 +32,61 @@ if __name__ == '__main__':
 
     pinOnOff = DigitalOutputDevice(pin=26, active_high=False)
 
-    while 1:
-        #turn on
-        pinOnOff.on()
-
-        time.sleep(10)
-
-        device = serial.Serial("/dev/ttyAMA0", 9600)
-        device.reset_input_buffer()
-        device.reset_output_buffer()
-
-        print(f'Device name: {device.name}. Settings: {device.get_settings()}. Starting @ {datetime.now().isoformat()}')
-
-        # wake up!
-        device.write(construct_command(CMD_SLEEP, [0x1, 1]))
-        device.write(construct_command(CMD_MODE, [0x1, 1]))
-        device.write(construct_command(CMD_QUERY_DATA))
-        # device.flushOutput()
-
-        mark = datetime.now()
-        while device.inWaiting() > 0:
-            btes = device.read_all()
-
-            print(f'{int((datetime.now() - mark).total_seconds()*1000)}\t{btes.hex()}, size: {len(btes)}')
-            mark = datetime.now()
-
-            if len(btes) == 10:
-                r = struct.unpack('<HHxxBB', btes[2:])
-                pm25 = r[0] / 10.0
-                pm10 = r[1] / 10.0
-                # checksum = sum(v for v in btes[2:8]) % 256
-                print(f'PM25: {pm25}, PM10: {pm10}')
+    # the port is opened once and shared by all power cycles of the sensor;
+    # reads block until the whole frame arrives or the timeout passes
+    device = serial.Serial("/dev/ttyAMA0", 9600)
+    device.timeout = 2.0
+    try:
+        while 1:
+            #turn on
+            pinOnOff.on()
+
+            time.sleep(10)
+
+            device.reset_input_buffer()
+            device.reset_output_buffer()
+
+            print(f'Device name: {device.name}. Settings: {device.get_settings()}. Starting @ {datetime.now().isoformat()}')
+
+            # wake up!
+            device.write(construct_command(CMD_SLEEP, [0x1, 1]))
+            device.write(construct_command(CMD_MODE, [0x1, 1]))
+            device.write(construct_command(CMD_QUERY_DATA))
+            # device.flushOutput()
+
+            mark_ns = time.monotonic_ns()
+            # each of the commands is answered with own frame: acknowledgements (0xc5) of the setup commands come first,
+            # the data frame (0xc0) follows; frames are read until the data arrives or the timeout passes
+            deadline_ns = mark_ns + int(3 * device.timeout * 1_000_000_000)
+            while True:
+                # sync to the frame head (0xaa), then read the remaining 9 bytes of the frame
+                # (size passed positionally, as the name of the parameter differs among pyserial versions)
+                if not device.read_until(b'\xaa', 64).endswith(b'\xaa') or time.monotonic_ns() > deadline_ns:
+                    print('No response')
+                    break
+                btes = b'\xaa' + device.read(9)
+                if len(btes) < 10 or btes[1] != 0xc0:
+                    # acknowledgement of a setup command or incomplete frame
+                    continue
+
+                print(f'{(time.monotonic_ns() - mark_ns) // 1_000_000}\t{btes.hex()}, size: {len(btes)}')
+
+                # frame: head, command, PM2.5, PM10, device id, checksum, tail
+                _, _, pm25_raw, pm10_raw, checksum, _ = struct.unpack('<BBHHxxBB', btes)
+                if checksum == sum(btes[2:8]) & 0xff:
+                    print(f'PM25: {pm25_raw / 10.0}, PM10: {pm10_raw / 10.0}')
+                else:
+                    print('Corrupted frame')
                 break
 
-        # device.write(construct_command(CMD_MODE, [0x1, 0]))
-        # device.write(construct_command(CMD_SLEEP, [0x1, 0]))
+            # device.write(construct_command(CMD_MODE, [0x1, 0]))
+            # device.write(construct_command(CMD_SLEEP, [0x1, 0]))
 
-        # time.sleep(10)
+            # time.sleep(10)
 
-        pinOnOff.off()
-        time.sleep(10)
+            pinOnOff.off()
+            time.sleep(10)
+    finally:
+        device.close()
 
-    print(f'Device {device._component_name} is closed')
+    print(f'Device {device.name} is closed')
@@ -19,23 +19,38 @@ class AirQualitySensor:
         self.device = serial.Serial("/dev/ttyAMA0", 9600)
         self.power = DigitalOutputDevice(pin=power_pin, active_high=False)
 
-    def execute_command(self, cmd, data=[]):
+    def close(self):
+        """
+        Releases the serial port and the power pin
+        """
+        self.device.close()
+        self.power.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @staticmethod
+    def construct_command(cmd, data=()) -> bytearray:
         assert len(data) <= 12
-        data += [0, ] * (12 - len(data))
         checksum = (sum(data) + cmd - 2) % 256
-        bts = list()
-        bts.append(ord('\xaa'))
-        bts.append(ord('\xb4'))
-        bts.append(cmd)
-        for d in data:
-            bts.append(d)
-        bts.append(ord('\xff'))
-        bts.append(ord('\xff'))
-        bts.append(checksum)
-        bts.append(ord('\xab'))
-
-        self.device.write(bts)
-        self.device.flushOutput()
+        # head, command, 12 bytes of data (zero-padded), device id (any), checksum, tail
+        bts = bytearray(19)
+        bts[0:3] = (0xaa, 0xb4, cmd)
+        bts[3:3 + len(data)] = data
+        bts[15:19] = (0xff, 0xff, checksum, 0xab)
+
+        return bts
+
+    def _command(self, cmd, data=()) -> bytes:
+        _command = _CONSTANT_COMMANDS.get((cmd, tuple(data)))
+        return self.construct_command(cmd, data) if _command is None else _command
+
+    def execute_command(self, cmd, data=()):
+        # no flush needed: the response is awaited anyway, which cannot come before the command is sent
+        self.device.write(self._command(cmd, data))
         return self._read_response()
 
     def _read_response(self) -> bytes:
@@ -43,23 +58,26 @@ class AirQualitySensor:
         Reads 10 bytes staring from 'aa'
         :return:
         """
-        start_byte = 0
-        while start_byte != b'\xaa':
-            start_byte = self.device.read()
+        # skip everything up to the start byte; read_until consumes the buffered bytes at once,
+        # rather than byte by byte (passed positionally, as the name of the parameter differs among pyserial versions)
+        while not self.device.read_until(b'\xaa', 64).endswith(b'\xaa'):
+            pass
 
         rest_of_bytes = self.device.read(size=9)
 
-        return start_byte + rest_of_bytes
+        return b'\xaa' + rest_of_bytes
 
     def _read_single(self) -> tuple:
         read_bytes = self.execute_command(self.CMD_QUERY_DATA)
 
-        if read_bytes[1] != 192:
+        # frame: head, command, PM2.5, PM10, device id, checksum, tail
+        _, command, pm25_raw, pm10_raw, checksum, _ = struct.unpack('<BBHHxxBB', read_bytes)
+
+        if command != 192 or checksum != sum(read_bytes[2:8]) & 0xff:
             return None, None
 
-        pms = struct.unpack('<HHxxBB', read_bytes[2:])
-        pm25 = pms[0] / 10.0
-        pm10 = pms[1] / 10.0
+        pm25 = pm25_raw / 10.0
+        pm10 = pm10_raw / 10.0
 
         return pm25, pm10
 
@@ -70,8 +88,10 @@ class AirQualitySensor:
         # warm up
         time.sleep(10)
 
-        # command to read data
-        self.execute_command(self.CMD_MODE, [0x1, 1])
+        # wake up and switch to query mode with a single write; each of the commands is answered with own frame
+        self.device.write(self._command(self.CMD_SLEEP, (0x1, 1)) + self._command(self.CMD_MODE, (0x1, 1)))
+        self._read_response()
+        self._read_response()
 
         # read data to obtain N readings
         for i in range(readings_count):
@@ -84,6 +104,16 @@ class AirQualitySensor:
         return None
 
 
+# commands with constant data, sent on each read cycle; constructed once, at import
+_CONSTANT_COMMANDS = {
+    (_cmd, _data): bytes(AirQualitySensor.construct_command(_cmd, _data)) for _cmd, _data in (
+        (AirQualitySensor.CMD_SLEEP, (0x1, 1)),
+        (AirQualitySensor.CMD_MODE, (0x1, 1)),
+        (AirQualitySensor.CMD_QUERY_DATA, ()))
+}
+
+
 if __name__ == '__main__':
 
-    AirQualitySensor(26).read(30)
+    with AirQualitySensor(26) as sensor:
+        sensor.read(30)
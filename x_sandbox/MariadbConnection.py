@@ -7,12 +7,12 @@ try:
 
     cursor.execute('select st_id, st_name from sensor_types order by st_id asc;')
 
-     for (st_id, st_name) in cursor:
+    for (st_id, st_name) in cursor:
         print('ID: ' + str(st_id))
         print('name: ' + st_name)
 
 except mariadb.Error as e:
-    print('Something went terribly wrong: {}').format(e)
+    print(f'Something went terribly wrong: {e}')
 
 finally:
     cursor.close()
@@ -2,6 +2,7 @@
 
 from configparser import ConfigParser
 import mysql.connector as mariadb
+import atexit
 import logging
 import random
 import time
@@ -24,36 +25,60 @@ logging.basicConfig(
     datefmt='%Y-%m-%d %H:%M:%S')
 log = logging.getLogger(__name__)
 
-try:
-    conn = mariadb.connect(user=user, password=passwd, database=db, host=host)
+# bound method of own generator, saves the lookup of the module-level instance on each call
+_rnd = random.Random().random
+
+_conn = None
+
+
+def _close_connection():
+    if _conn is not None:
+        _conn.close()
 
-    cursor = conn.cursor()
 
-    cursor.execute('select st_id, st_name from sensor_types order by st_id asc;')
+def get_cursor():
+    """
+    Returns cursor of the connection that is opened on first use and kept open afterwards.
+    The connection is pinged (and reconnected if needed) before each reuse; it is closed at exit.
+    :return: new cursor
+    """
+    global _conn
+    if _conn is None:
+        _conn = mariadb.connect(user=user, password=passwd, database=db, host=host)
+        atexit.register(_close_connection)
+    else:
+        _conn.ping(reconnect=True)
+    return _conn.cursor()
+
+
+try:
+    cursor = get_cursor()
+    try:
+        cursor.execute('select st_id, st_name from sensor_types order by st_id asc;')
 
-    for (st_id, st_name) in cursor:
-        log.info('ID: %i', st_id)
-        log.info('name: %s', st_name)
+        for (st_id, st_name) in cursor:
+            log.info('ID: %i', st_id)
+            log.info('name: %s', st_name)
+    finally:
+        cursor.close()
 
 except mariadb.Error as e:
     log.critical('Something went terribly wrong')
     log.error(e, exc_info=True)
 
-finally:
-    cursor.close()
-    conn.close()
+# the calculation loop below does not touch the database, hence no connection is (re)opened there
 
-val = int(100000*random.random())
-div = int(1000*random.random())
+val = int(100000*_rnd())
+div = int(1000*_rnd())
 while True:
     log.info('Calculating %i %% %i', val, div)
     res = val % div
     log.info('Result = %i', res)
-    val = int(100000 * random.random())
+    val = int(100000 * _rnd())
     if res != 0:
         div = res
 
-    slp = random.random()/2
+    slp = _rnd()/2
     log.info('Let me think now for %f seconds', slp)
     time.sleep(slp)
 
@@ -1,4 +1,5 @@
 import serial
+import struct
 import time
 from datetime import datetime
 from os import system
@@ -7,7 +8,8 @@ from os import system
 if __name__ == '__main__':
     print(f'Distance meter. Serial version: {serial.__version__}')
 
-    device = serial.Serial("/dev/ttyAMA0", 9600)
+    # frames are read with blocking calls; the timeout only lets the loop notice the device got closed
+    device = serial.Serial("/dev/ttyAMA0", 9600, timeout=0.2)
     device.reset_input_buffer()
     device.reset_output_buffer()
     device.setRTS(1)
@@ -19,28 +21,40 @@ if __name__ == '__main__':
     max_ = 0
     summed = 0
 
+    # monotonic clock is enough for the interval between frames; wall-clock time is not needed here
+    mark_ns = time.monotonic_ns()
     while device.isOpen():
-        mark = datetime.now()
-        while device.inWaiting() > 0:
-            btes = device.read_all()
-            reading += 1
+        # frame: header (0xff), measure [mm] as big-endian unsigned short, checksum
+        # sync to the header first, then read exactly the rest of the frame
+        if not device.read_until(b'\xff', 8).endswith(b'\xff'):
+            continue
+        rest = device.read(3)
+        if len(rest) < 3:
+            continue
+        btes = b'\xff' + rest
 
-            btesInt = [bte for bte in btes]
+        measure, checksum = struct.unpack('>HB', rest)
 
-            sum_ = (btes[0] + btes[1] + btes[2]) & 0x00ff
+        sum_ = (btes[0] + btes[1] + btes[2]) & 0x00ff
+        if sum_ != checksum:
+            # 0xff data byte was taken for the header: the frame is misaligned, resync
+            continue
 
-            measure = btesInt[1] * 256 + btesInt[2]
+        reading += 1
 
-            summed += measure
-            if min_ == 0 or min_ > measure:
-                min_ = measure
-            if max_ < measure:
-                max_ = measure
+        summed += measure
+        if min_ == 0 or min_ > measure:
+            min_ = measure
+        if max_ < measure:
+            max_ = measure
 
-            system('clear')
-            # print(f'{int((datetime.now() - mark).total_seconds()*1000)}\t{btes.hex( )}\t\t{btesInt}\t{sum}\t{"correct" if sum == btesInt[3] else "WRONG!"}\t{btesInt[1]*256+btesInt[2]} [mm]')
-            print(f'{reading}\t{int((datetime.now() - mark).total_seconds() * 1000)} [ms] \t{btes.hex()}\t{measure} [mm]\tmin:{min_}\tavg:{int(summed/reading)}\tmax:{max_}')
-            mark = datetime.now()
+        now_ns = time.monotonic_ns()
+        dt_ms = (now_ns - mark_ns) // 1_000_000
+        mark_ns = now_ns
+
+        system('clear')
+        # print(f'{dt_ms}\t{btes.hex( )}\t\t{sum_}\t{"correct" if sum_ == checksum else "WRONG!"}\t{measure} [mm]')
+        print(f'{reading}\t{dt_ms} [ms] \t{btes.hex()}\t{measure} [mm]\tmin:{min_}\tavg:{int(summed/reading)}\tmax:{max_}')
 
     print(f'Device {device.name} is closed')
 
@@ -1,7 +1,7 @@
 import subprocess
 import re
 
-pattern = re.compile("temp=(\\d*.\\d*).*")
+pattern = re.compile(rb"temp=(\d+\.\d+)")
 
 execRes = subprocess.run(['vcgencmd', 'measure_temp'], capture_output=True)
 
@@ -9,7 +9,8 @@ if execRes.returncode == 0:
     print('measure succeeded')
     print('Stdout: ', execRes.stdout.decode('utf-8'))
     print('Stderr: ', execRes.stderr.decode('utf-8'))
-    print('Temperature: '+pattern.match(execRes.stdout.decode('utf-8')).group(1))
+    temp_matched = pattern.search(execRes.stdout)
+    print('Temperature: ' + (temp_matched.group(1).decode() if temp_matched else 'cannot be parsed'))
 
 else:
     print('measure failed. Return code: ', execRes.returncode)
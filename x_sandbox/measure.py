@@ -2,7 +2,6 @@ import os
 import glob
 import time
 from datetime import datetime
-import re
 
 
 if __name__ == '__main__':
@@ -11,7 +10,7 @@ if __name__ == '__main__':
 
     DEVICES_BASEDIR = '/sys/bus/w1/devices/'
     DEVICE_SUBDIR = '/w1_slave'
-    device_file_re_pattern = re.compile('.*t=(\\d*)')
+    TEMPERATURE_MARK = b't='
 
     while True:
 
@@ -21,26 +20,27 @@ if __name__ == '__main__':
             device_file = device_dir + DEVICE_SUBDIR
             sensor_reference = os.path.basename(device_dir)
 
-            with open(device_file, 'r') as file:
-                lines = file.read().splitlines(keepends=False)
+            with open(device_file, 'rb') as file:
+                content = file.read()
                 reading_timestamp = datetime.now()
                 sensor_last_modification = datetime.fromtimestamp(os.stat(device_file).st_mtime)
                 success = None
                 temp = None
-                if lines[0].endswith('YES'):  # crc check
-                    temp_matched = device_file_re_pattern.match(lines[1])
-                    if temp_matched:
-                        temp = int(temp_matched.group(1))/1000
+                # the first line ends with crc check result, the second one with the temperature in milli-degrees
+                first_line_end = content.find(b'\n')
+                if content[:first_line_end].endswith(b'YES'):  # crc check
+                    temp_pos = content.rfind(TEMPERATURE_MARK)
+                    if temp_pos > first_line_end:
+                        temp = int(content[temp_pos + len(TEMPERATURE_MARK):]) / 1000
                         print(f'Temperature read: {temp} [\u2103] @ {device_file}. '
                               f'Reference: {sensor_reference}. '
                               f'Sensor last-modification: {sensor_last_modification}, '
                               f'Timestamp: {reading_timestamp}')
                     else:
                         print(f'Temperature reading @ {device_file} failed. '
-                              f'Cannot unparse temperature from {lines[1]} using '
-                              f'pattern {device_file_re_pattern.pattern}. '
-                              f'First line is: {lines[0]}')
+                              f'Cannot find {TEMPERATURE_MARK.decode()} in the second line. '
+                              f'Read content is: {content.decode()}')
                 else:
-                    print(f'Temperature reading failed. Read lines are: {lines}')
+                    print(f'Temperature reading failed. Read content is: {content.decode()}')
 
             time.sleep(5)
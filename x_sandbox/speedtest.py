@@ -6,11 +6,11 @@ execRes = subprocess.run(['speedtest', '--format=json'], capture_output=True)
 if execRes.returncode == 0:
     print('Speedtest execution succeeded')
 
-    res = json.loads(execRes.stdout, encoding='utf-8')
-    jitterMicroSecs = int(1000*float(res['ping']['jitter']))
-    pingMicroSecs = int(1000*float(res['ping']['latency']))
-    downloadKbps = int(int(res['download']['bandwidth'])*8/1000)
-    uploadKbps = int(int(res['upload']['bandwidth'])*8/1000)
+    res = json.loads(execRes.stdout)
+    jitterMicroSecs = int(1000 * res['ping']['jitter'])
+    pingMicroSecs = int(1000 * res['ping']['latency'])
+    downloadKbps = res['download']['bandwidth'] * 8 // 1000
+    uploadKbps = res['upload']['bandwidth'] * 8 // 1000
     externalIP = res['interface']['externalIp']
 
     print(f"Result: "
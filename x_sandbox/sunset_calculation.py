@@ -1,58 +1,158 @@
 # source: https://www.esrl.noaa.gov/gmd/grad/solcalc/solareqns.PDF
 
-from datetime import datetime, tzinfo
+from datetime import datetime, timezone
 import math
-
-
-now = datetime.now()
-day_of_year = (now - datetime(now.year, 1, 1)).days
-hour = 0
+import numpy as np
+
+# the location
+LATTITUDE_DEG = 49.993906
+LONGITUDE_DEG = 19.96859
+
+# local time zone, resolved once
+LOCAL_TZ = datetime.now().astimezone().tzinfo
+
+# cos of the zenith of the sunset: 90.833 degrees, refraction and the size of the solar disk included
+_COS_SUNSET_ZENITH = math.cos(math.radians(90.833))
+
+
+def solar_terms(sin_1, cos_1) -> tuple:
+    """
+    Evaluates declination angle and equation of time out of sin and cos of the fractional year (γ).
+    Uses only arithmetic operations, hence works for scalars as well as for numpy arrays.
+    :param sin_1: sin(γ)
+    :param cos_1: cos(γ)
+    :return: declination angle [rad], equation of time [min]
+    """
+    # sin and cos of the multiples of γ are derived from sin(γ) and cos(γ) with the Chebyshev recurrence
+    # x(k) = 2cos(γ)x(k-1) - x(k-2), seeded with cos(0) = 1 and sin(0) = 0,
+    # so that only two trigonometric functions are evaluated and each next harmonic costs two multiply-adds
+    cos_1_2 = 2 * cos_1
+    sin_2 = cos_1_2 * sin_1
+    cos_2 = cos_1_2 * cos_1 - 1
+    sin_3 = cos_1_2 * sin_2 - sin_1
+    cos_3 = cos_1_2 * cos_2 - cos_1
+
+    #decl = 0.006918 – 0.399912cos(γ) + 0.070257sin(γ) – 0.006758cos(2γ) + 0.000907sin(2γ) – 0.002697cos(3γ) + 0.00148sin (3γ)
+    declination_angle = 0.006918-0.399912*cos_1\
+                        + 0.070257*sin_1 \
+                        - 0.006758*cos_2 \
+                        + 0.000907*sin_2 \
+                        - 0.002697*cos_3 \
+                        + 0.00148*sin_3
+
+    # eqtime = 229.18*(0.000075 + 0.001868cos(γ) – 0.032077sin(γ) – 0.014615cos(2γ) – 0.040849sin(2γ) )
+    equation_of_time = 229.18*(0.000075 + 0.001868*cos_1
+                               - 0.032077*sin_1
+                               - 0.014615*cos_2
+                               - 0.040849*sin_2)
+
+    return declination_angle, equation_of_time
+
+
+# fractional year (γ) is evaluated at midnight UTC (hour = 0): γ = 2π/365 * (day_of_year - 1 + (hour - 12)/24)
+_RAD_PER_DAY = 2*math.pi/365
+_DAY_OFFSET = -1 + (0 - 12)/24
+
+# declination angle and equation of time for each day of the year (indexed with the day of year, leap years included),
+# evaluated once for all the days with vectorized numpy functions
+_fractional_years = _RAD_PER_DAY*(np.arange(366)+_DAY_OFFSET)
+DECLINATION_BY_DAY, EQUATION_OF_TIME_BY_DAY = solar_terms(np.sin(_fractional_years), np.cos(_fractional_years))
+
+
+def _sunset(lattitude_deg: float, longitude_deg: float, declination_angle, equation_of_time):
+    """
+    Calculates the time of sunset for given declination angle and equation of time.
+    Works for scalars as well as for numpy arrays; the arguments are broadcast against each other.
+    :param lattitude_deg: lattitude of the location [degrees]
+    :param longitude_deg: longitude of the location [degrees]
+    :param declination_angle: declination angle [rad]
+    :param equation_of_time: equation of time [min]
+    :return: sunset time in minutes since midnight UTC; NaN if the sun does not set that day (polar day or night)
+    """
+    # the terms that depend only on the location are evaluated once, also when the whole year is calculated
+    _lattitude = np.radians(lattitude_deg)
+    _cos_zenith_by_cos_lattitude = _COS_SUNSET_ZENITH / np.cos(_lattitude)
+    _tan_lattitude = np.tan(_lattitude)
+
+    hour_angle_deg = -np.degrees(
+        np.arccos(
+            _cos_zenith_by_cos_lattitude / np.cos(declination_angle) - _tan_lattitude * np.tan(declination_angle)))
+
+    return 720 - 4 * (longitude_deg + hour_angle_deg) - equation_of_time
+
+
+def sunset_minutes(lattitude_deg: float, longitude_deg: float, day_of_year: int) -> float:
+    """
+    Calculates the time of sunset using the yearly tables of declination angle and equation of time
+    :param lattitude_deg: lattitude of the location [degrees]
+    :param longitude_deg: longitude of the location [degrees]
+    :param day_of_year: day of year, starting from 0
+    :return: sunset time in minutes since midnight UTC
+    :raises ValueError: if the sun does not set that day (polar day or night)
+    """
+    with np.errstate(invalid='ignore'):
+        _sunset_minutes = _sunset(
+            lattitude_deg, longitude_deg, DECLINATION_BY_DAY[day_of_year], EQUATION_OF_TIME_BY_DAY[day_of_year])
+    if math.isnan(_sunset_minutes):
+        raise ValueError(f'There is no sunset on day {day_of_year} at lattitude {lattitude_deg}')
+    return float(_sunset_minutes)
+
+
+def sunset_table(lattitude_deg: float, longitude_deg: float) -> np.ndarray:
+    """
+    Calculates the times of sunset for each day of the year at once, with vectorized numpy functions
+    :param lattitude_deg: lattitude of the location [degrees]
+    :param longitude_deg: longitude of the location [degrees]
+    :return: sunset times in minutes since midnight UTC, indexed with the day of year;
+    NaN for the days when the sun does not set (polar day or night)
+    """
+    return _sunset(lattitude_deg, longitude_deg, DECLINATION_BY_DAY, EQUATION_OF_TIME_BY_DAY)
+
+
+def sunset_grid(lattitudes_deg, longitudes_deg) -> np.ndarray:
+    """
+    Calculates the times of sunset for each day of the year for many locations at once:
+    the locations are laid along the first axis, so that the whole grid is evaluated by numpy in single passes
+    :param lattitudes_deg: sequence of lattitudes of the locations [degrees]
+    :param longitudes_deg: sequence of longitudes of the locations [degrees], of the same length as lattitudes
+    :return: sunset times in minutes since midnight UTC, rows correspond to the locations, columns to the days of year;
+    NaN for the days when the sun does not set at given location (polar day or night)
+    """
+    return _sunset(
+        np.asarray(lattitudes_deg, dtype=np.float64)[:, np.newaxis],
+        np.asarray(longitudes_deg, dtype=np.float64)[:, np.newaxis],
+        DECLINATION_BY_DAY,
+        EQUATION_OF_TIME_BY_DAY)
+
+
+# tm_yday starts from 1
+day_of_year = datetime.now().timetuple().tm_yday - 1
 
 # gamma
-fractional_year = 2*math.pi*(day_of_year-1+(hour-12)/24)/365
+fractional_year = _fractional_years[day_of_year]
 
 print(f'Fractional year = {fractional_year} [rad]')
 
-#decl = 0.006918 – 0.399912cos(γ) + 0.070257sin(γ) – 0.006758cos(2γ) + 0.000907sin(2γ) – 0.002697cos(3γ) + 0.00148sin (3γ)
-declination_angle = 0.006918-0.399912*math.cos(fractional_year)\
-                    + 0.070257*math.sin(fractional_year) \
-                    - 0.006758*math.cos(2*fractional_year) \
-                    + 0.000907*math.sin(2*fractional_year) \
-                    - 0.002697*math.cos(3*fractional_year) \
-                    + 0.00148*math.sin(3*fractional_year)
-
-print(f'Declination angle = {declination_angle}')
-
-# eqtime = 229.18*(0.000075 + 0.001868cos(γ) – 0.032077sin(γ) – 0.014615cos(2γ) – 0.040849sin(2γ) )
-equation_of_time = 229.18*(0.000075 + 0.001868*math.cos(fractional_year)
-                           - 0.032077*math.sin(fractional_year)
-                           - 0.014615*math.cos(2*fractional_year)
-                           - 0.040849*math.sin(2*fractional_year))
-
-print(f'Equation of time = {equation_of_time}')
-
-lattitude_deg = 49.993906
-longitude_deg = 19.96859
-
+print(f'Declination angle = {DECLINATION_BY_DAY[day_of_year]}')
 
-print(f'Lattitude: {lattitude_deg}, longitude: {longitude_deg} [degrees]')
+print(f'Equation of time = {EQUATION_OF_TIME_BY_DAY[day_of_year]}')
 
-hour_angle_deg = -math.degrees(
-    math.acos(
-        (math.cos(math.radians(90.833))/(math.cos(math.radians(lattitude_deg)) * math.cos(declination_angle)))
-        - math.tan(math.radians(lattitude_deg))*math.tan(declination_angle)))
+print(f'Lattitude: {LATTITUDE_DEG}, longitude: {LONGITUDE_DEG} [degrees]')
 
+sunset = sunset_minutes(LATTITUDE_DEG, LONGITUDE_DEG, day_of_year)
 
-sunset = 720 - 4 * (longitude_deg + hour_angle_deg) - equation_of_time
+sunset_hour, sunset_minute = divmod(int(sunset), 60)
 
-print(f'Sunset: {sunset} [min] == {int(sunset/60)}:{int(sunset%60)}')
+print(f'Sunset: {sunset} [min] == {sunset_hour}:{sunset_minute}')
 
-utc = datetime.utcnow().replace(hour=int(sunset/60), minute=int(sunset%60), second=0, microsecond=0)
-cest = utc.astimezone()
+now_utc = datetime.now(timezone.utc)
+utc = now_utc.replace(hour=sunset_hour, minute=sunset_minute, second=0, microsecond=0)
+cest = utc.astimezone(LOCAL_TZ)
+now_local = now_utc.astimezone(LOCAL_TZ)
 
-diff = cest -  datetime.utcnow().astimezone()
+diff = cest - now_local
 
-print(f'Sunset is at: {utc} UTC, {cest} CEST, now: {datetime.utcnow().astimezone()}, diff: {diff}, final: {(cest+cest.utcoffset()).replace(tzinfo=None)}')
+print(f'Sunset is at: {utc} UTC, {cest} CEST, now: {now_local}, diff: {diff}, final: {cest.replace(tzinfo=None)}')
 
 
 